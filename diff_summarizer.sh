@@ -1,5 +1,5 @@
 #!/bin/bash
-python get_diff.py "$1" "$2"
+python get_diff.py "$1" "$2" --output_file diff.txt
 if [ $? -eq 0 ] && [ -f "diff.txt" ]; then
     ./llm_summarize diff.txt --output output.md
 else
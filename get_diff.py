@@ -1,46 +1,496 @@
-import argparse
+import asyncio
+import contextlib
+import hashlib
+import http.client
+import json
 import logging
+import mmap
 import os
+import re
+import selectors
+import shutil
 import subprocess
 import sys
 import tempfile
-from typing import Optional, List, Tuple
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Callable, Iterator, Optional, List, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows; pipes keep their default size there.
+    fcntl = None
+
+try:
+    # google-re2 matches in linear time without backtracking; the standard
+    # library engine is a drop-in fallback for the filter patterns.
+    import re2 as _filter_re
+except ImportError:
+    _filter_re = re
 
-# --- Logging Setup ---
-log_formatter = logging.Formatter(
-    "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
-log_handler = logging.StreamHandler(sys.stdout)  # Log to console
-log_handler.setFormatter(log_formatter)
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-logger.addHandler(log_handler)
-# --- End Logging Setup ---
 
+_DEFAULT_FILE_FILTERS = (
+    "*.py", "*.js", "*.jsx", "*.ts", "*.tsx",
+    ":(exclude)**/dist/**",
+    ":(exclude)**/build/**",
+    ":(exclude)**/node_modules/**",
+    ":(exclude)**/.cache/**",
+    ":(exclude)**/coverage/**",
+    ":(exclude)**/*.min.js",
+    ":(exclude)**/*.bundle.js",
+    ":(exclude)**/*.chunk.js",
+    ":(exclude)**/*.generated.*",
+    ":(exclude)**/*.d.ts",
+    ":(exclude)**/package-lock.json",
+    ":(exclude)**/yarn.lock",
+)
+
+_SHORTSTAT_INSERTIONS_RE = re.compile(r"(\d+) insertions?\(\+\)")
+_SHORTSTAT_DELETIONS_RE = re.compile(r"(\d+) deletions?\(-\)")
+# Linux caps unprivileged pipe buffers at 1 MiB by default.
+_PIPE_CHUNK_SIZE = 1 << 20
+# Window copied out of a mapped diff file per counting pass.
+_MMAP_CHUNK_SIZE = 1 << 20
+_GITHUB_REPO_RE = re.compile(
+    r"^(?:https?://github\.com/|git@github\.com:)"
+    r"(?P<owner>[^/]+)/(?P<repo>[^/]+?)(?:\.git)?/?$"
+)
+_EXCLUDE_MAGIC_PREFIXES = (":(exclude)", ":!", ":^")
+_GLOB_CHARS = "*?["
+# The compare API lists at most this many changed files.
+_GITHUB_COMPARE_MAX_FILES = 300
+_UPSTREAM_CACHE_STALE_MESSAGE = (
+    "Failed to update upstream cache; continuing with the cached copy"
+)
+
+
+def _diff_header_line_counts(diff, start: int, end: int) -> tuple[int, int]:
+    """Counts the "+" and "-" lines in the file headers of diff[start:end].
 
-def _parse_diff_output(diff_text: str) -> tuple[int, int]:
-    """Parses raw diff text to count additions and deletions."""
+    diff is bytes or an mmap. Hunk bodies may contain "+++"/"---" lines (an
+    added "++x", a removed "--i;"), so only the "+++"/"---" file headers are
+    not changes. Hunk lines never start with "diff" or "@@", so a file's
+    header runs from its "diff --git" line to its first "@@" hunk header.
+    """
+    plus_lines = 0
+    minus_lines = 0
+    if diff[start:start + 11] == b"diff --git ":
+        section = start
+    else:
+        section = diff.find(b"\ndiff --git ", start, end)
+    while section != -1:
+        next_section = diff.find(b"\ndiff --git ", section + 1, end)
+        section_end = end if next_section == -1 else next_section
+        header_end = diff.find(b"\n@@", section, section_end)
+        if header_end == -1:
+            header_end = section_end
+        header = diff[section:header_end]
+        plus_lines += header.count(b"\n+")
+        minus_lines += header.count(b"\n-")
+        section = next_section
+    return plus_lines, minus_lines
+
+
+def _parse_diff_output(diff_bytes: bytes) -> tuple[int, int]:
+    """Parses raw git diff bytes to count additions and deletions."""
     additions = 0
     deletions = 0
     try:
-        lines = diff_text.splitlines()
-        for line in lines:
-            if line.startswith("+") and not line.startswith("+++"):
-                additions += 1
-            elif line.startswith("-") and not line.startswith("---"):
-                deletions += 1
+        # Count line prefixes with C-level substring scans instead of
+        # splitting the diff into lines; the first line has no preceding
+        # newline. File header lines also start with "+" or "-", so subtract
+        # those.
+        additions = diff_bytes.count(b"\n+")
+        deletions = diff_bytes.count(b"\n-")
+        if diff_bytes.startswith(b"+"):
+            additions += 1
+        elif diff_bytes.startswith(b"-"):
+            deletions += 1
+        header_plus, header_minus = _diff_header_line_counts(
+            diff_bytes, 0, len(diff_bytes)
+        )
+        additions -= header_plus
+        deletions -= header_minus
     except Exception as e:
-        logger.warning(f"Could not parse diff line counts: {e}")
+        logger.warning("Could not parse diff line counts: %s", e)
+    return additions, deletions
+
+
+def _parse_diff_file(fp: BinaryIO, start: int = 0) -> Optional[tuple[int, int]]:
+    """Counts additions and deletions in the git diff written to fp from offset start.
+
+    The file is memory-mapped and scanned in fixed-size windows, so only the
+    pages being counted are resident no matter how large the diff is. The
+    counts match `git diff --shortstat`. Returns None if the file cannot be
+    mapped (e.g. it was opened write-only).
+    """
+    end = os.fstat(fp.fileno()).st_size
+    if end <= start:
+        return 0, 0
+    try:
+        mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        logger.debug("Could not map diff file for counting: %s", e)
+        return None
+
+    additions = 0
+    deletions = 0
+    with mm:
+        if hasattr(mmap, "MADV_SEQUENTIAL"):
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+        # Count every line starting with "+" or "-". Each window reaches one
+        # byte past its end so that a match straddling the boundary is
+        # counted, but only in the window it starts in.
+        for pos in range(start, end, _MMAP_CHUNK_SIZE):
+            chunk = mm[pos:pos + _MMAP_CHUNK_SIZE + 1]
+            size = min(_MMAP_CHUNK_SIZE, end - pos)
+            additions += chunk.count(b"\n+", 0, size + 1)
+            deletions += chunk.count(b"\n-", 0, size + 1)
+        head = mm[start:start + 1]
+        if head == b"+":
+            additions += 1
+        elif head == b"-":
+            deletions += 1
+        # File header lines also start with "+" or "-"; subtract those.
+        header_plus, header_minus = _diff_header_line_counts(mm, start, end)
+    additions -= header_plus
+    deletions -= header_minus
     return additions, deletions
 
 
+def _parse_shortstat(shortstat_text: str) -> tuple[int, int]:
+    """Extracts additions and deletions from `git diff --shortstat` output."""
+    insertions_match = _SHORTSTAT_INSERTIONS_RE.search(shortstat_text)
+    deletions_match = _SHORTSTAT_DELETIONS_RE.search(shortstat_text)
+    additions = int(insertions_match.group(1)) if insertions_match else 0
+    deletions = int(deletions_match.group(1)) if deletions_match else 0
+    return additions, deletions
+
+
+def _parse_numstat(numstat_bytes: bytes) -> tuple[int, int]:
+    """Sums additions and deletions from `git diff --numstat -z` records."""
+    additions = 0
+    deletions = 0
+    fields = numstat_bytes.split(b"\0")
+    i = 0
+    while i < len(fields):
+        if not fields[i]:
+            i += 1
+            continue
+        added, deleted, path = fields[i].split(b"\t", 2)
+        # Renames and copies leave the path empty and put the old and new
+        # paths in the next two fields.
+        i += 1 if path else 3
+        # Binary files report "-" instead of line counts.
+        if added != b"-":
+            additions += int(added)
+            deletions += int(deleted)
+    return additions, deletions
+
+
+def _log_command(message: str, cmd: List[str]) -> None:
+    """Logs a command line, joining its arguments only if the record will be emitted."""
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("%s: %s", message, " ".join(cmd))
+
+
+def _run_git(cmd: List[str], error_message: str) -> None:
+    """Runs a git command that must succeed, exiting with an error otherwise."""
+    _log_command("Executing command", cmd)
+    try:
+        subprocess.run(cmd, check=True, capture_output=True, text=True)
+    except subprocess.CalledProcessError as e:
+        logger.error("%s: %s", error_message, e.stderr)
+        sys.exit(1)
+
+
+def _spawn_git(cmd: List[str], error_message: str) -> None:
+    """Runs a git command whose output is not needed, capturing it only on failure.
+
+    posix_spawn skips the pipe and buffer setup of subprocess, which dominates
+    the cost of quick local commands such as `git init`.
+    """
+    if not hasattr(os, "posix_spawnp"):
+        _run_git(cmd, error_message)
+        return
+
+    _log_command("Executing command", cmd)
+    pid = os.posix_spawnp(
+        cmd[0],
+        cmd,
+        os.environ,
+        file_actions=[
+            (os.POSIX_SPAWN_OPEN, 1, os.devnull, os.O_WRONLY, 0),
+            (os.POSIX_SPAWN_OPEN, 2, os.devnull, os.O_WRONLY, 0),
+        ],
+    )
+    _, status = os.waitpid(pid, 0)
+    if os.waitstatus_to_exitcode(status) != 0:
+        # Re-run with captured output to report why it failed.
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            logger.error("%s: %s", error_message, result.stderr)
+            sys.exit(1)
+
+
+async def _gather_git(cmds: List[List[str]]) -> List[Tuple[int, str]]:
+    """Runs git commands concurrently, returning each exit code and stderr."""
+    procs = await asyncio.gather(
+        *(
+            asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            for cmd in cmds
+        )
+    )
+    outputs = await asyncio.gather(*(proc.communicate() for proc in procs))
+    return [
+        (proc.returncode, stderr.decode(errors="replace"))
+        for proc, (_, stderr) in zip(procs, outputs)
+    ]
+
+
+def _run_git_concurrently(steps: List[Tuple[List[str], str, bool]]) -> None:
+    """Runs independent git commands in parallel.
+
+    Each step is (command, error message, required). A failed required step
+    exits with an error; a failed optional one is only logged as a warning.
+    """
+    for cmd, _, _ in steps:
+        _log_command("Executing command", cmd)
+    results = asyncio.run(_gather_git([cmd for cmd, _, _ in steps]))
+    for (returncode, stderr), (_, error_message, required) in zip(results, steps):
+        if returncode == 0:
+            continue
+        if required:
+            logger.error("%s: %s", error_message, stderr)
+            sys.exit(1)
+        logger.warning("%s: %s", error_message, stderr)
+
+
+def _capture_output(cmd: List[str], cwd: str) -> Tuple[int, bytes, bytes]:
+    """Runs a command and drains its output in large reads.
+
+    Returns the exit code, stdout and stderr. The stdout pipe is enlarged so
+    a large diff needs far fewer read() calls than subprocess.run would make.
+    """
+    if fcntl is None or not hasattr(fcntl, "F_SETPIPE_SZ"):
+        # Pipes cannot be resized here, so large reads would not help.
+        result = subprocess.run(cmd, cwd=cwd, check=False, capture_output=True)
+        return result.returncode, result.stdout, result.stderr
+
+    with subprocess.Popen(
+        cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    ) as proc:
+        try:
+            fcntl.fcntl(proc.stdout.fileno(), fcntl.F_SETPIPE_SZ, _PIPE_CHUNK_SIZE)
+        except OSError:
+            # Over the per-user pipe buffer quota; keep the default size.
+            pass
+
+        # A selector, unlike select.select, also handles fds >= FD_SETSIZE in
+        # long-lived processes with many open files.
+        chunks = {proc.stdout: [], proc.stderr: []}
+        with selectors.DefaultSelector() as selector:
+            selector.register(proc.stdout, selectors.EVENT_READ)
+            selector.register(proc.stderr, selectors.EVENT_READ)
+            while selector.get_map():
+                for key, _ in selector.select():
+                    chunk = os.read(key.fd, _PIPE_CHUNK_SIZE)
+                    if chunk:
+                        chunks[key.fileobj].append(chunk)
+                    else:
+                        selector.unregister(key.fileobj)
+        returncode = proc.wait()
+    return returncode, b"".join(chunks[proc.stdout]), b"".join(chunks[proc.stderr])
+
+
+def _upstream_cache_path(original_repo_url: str) -> str:
+    """Returns the persistent bare cache location for an upstream repository."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    url_hash = hashlib.sha1(original_repo_url.encode()).hexdigest()
+    return os.path.join(cache_home, "github_scraper", f"upstream-{url_hash}.git")
+
+
+def _upstream_cache_update_cmd(cache_path: str, original_repo_branch: str) -> List[str]:
+    """Builds the command that fetches the latest upstream changes into the cache."""
+    return [
+        "git",
+        "-C",
+        cache_path,
+        "fetch",
+        "--filter=blob:none",
+        "--no-tags",
+        "--no-write-fetch-head",
+        "origin",
+        f"+refs/heads/{original_repo_branch}:refs/heads/{original_repo_branch}",
+    ]
+
+
+def _create_upstream_cache(
+    cache_path: str, original_repo_url: str, original_repo_branch: str
+) -> None:
+    """Clones the upstream cache, tolerating another run creating it at the same time.
+
+    The clone goes into a staging directory next to the cache and is renamed
+    into place, so a concurrent run never sees or clobbers a half-made cache.
+    """
+    cache_dir = os.path.dirname(cache_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    staging_path = tempfile.mkdtemp(prefix=".clone-", dir=cache_dir)
+    try:
+        clone_cmd = [
+            "git",
+            "clone",
+            "--bare",
+            "--filter=blob:none",
+            "--no-tags",
+            "--single-branch",
+            "--branch",
+            original_repo_branch,
+            original_repo_url,
+            staging_path,
+        ]
+        _run_git(clone_cmd, "Failed to create upstream cache")
+        try:
+            os.rename(staging_path, cache_path)
+        except OSError:
+            if not os.path.isdir(cache_path):
+                raise
+            logger.info("Upstream cache %s was created by another run.", cache_path)
+    finally:
+        shutil.rmtree(staging_path, ignore_errors=True)
+
+
+def _add_alternate(repo_path: str, cache_path: str) -> None:
+    """Lets a bare repository borrow objects from the cache, like `git clone --reference`."""
+    alternates_path = os.path.join(repo_path, "objects", "info", "alternates")
+    with open(alternates_path, "w", encoding="utf-8") as f:
+        f.write(os.path.join(cache_path, "objects") + "\n")
+
+
+@contextlib.contextmanager
+def _prepared_fork_repository(
+    original_repo_url: str,
+    fork_repo_url: str,
+    fork_repo_branch: str,
+    original_repo_branch: str,
+    update_upstream_cache: bool,
+) -> Iterator[Tuple[str, str]]:
+    """Fetches both branches into a temporary bare repository.
+
+    Yields the repository path and the three-dot range to diff in it; the
+    repository is removed on exit.
+    """
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logger.info("Created temporary directory: %s", tmpdir)
+
+        forked_path = os.path.join(tmpdir, "forked")
+
+        # A bare repository is enough for diffing two fetched refs, so no
+        # worktree is ever checked out. Fetches are blobless: git diff lazily
+        # fetches only the blobs of the files it actually compares.
+        init_cmd = ["git", "init", "--bare", "--quiet", forked_path]
+        logger.info("Initializing bare repository at %s...", forked_path)
+        _spawn_git(init_cmd, "Failed to initialize bare repository")
+
+        add_origin_cmd = [
+            "git", "-C", forked_path, "remote", "add", "origin", fork_repo_url
+        ]
+        logger.info("Adding fork repository %s as origin remote...", fork_repo_url)
+        _spawn_git(add_origin_cmd, "Failed to add origin remote")
+
+        # The upstream history lives in a persistent bare cache that only
+        # fetches deltas between runs. The fork repository borrows its objects,
+        # so the fork fetch downloads little beyond the fork's own commits.
+        cache_path = _upstream_cache_path(original_repo_url)
+        if not os.path.isdir(cache_path):
+            # Create the cache before fetching the fork, so the first run also
+            # downloads the shared upstream history only once.
+            logger.info(
+                "Creating upstream %s branch cache at %s...",
+                original_repo_branch,
+                cache_path,
+            )
+            _create_upstream_cache(cache_path, original_repo_url, original_repo_branch)
+            update_upstream_cache = False
+        _add_alternate(forked_path, cache_path)
+
+        fetch_origin_cmd = [
+            "git",
+            "-C",
+            forked_path,
+            "fetch",
+            "--filter=blob:none",
+            "--no-tags",
+            "--no-write-fetch-head",
+            "origin",
+            # An explicit destination creates the ref even when the branch
+            # argument names a tag, which `git clone --branch` also accepts.
+            f"+{fork_repo_branch}:refs/remotes/origin/{fork_repo_branch}",
+        ]
+        logger.info(
+            "Fetching fork repository %s branch %s...", fork_repo_url, fork_repo_branch
+        )
+        fetch_steps = [(fetch_origin_cmd, "Failed to fetch fork branch", True)]
+        if update_upstream_cache:
+            # The fork fetch and the cache update are independent network
+            # round trips, so run them side by side.
+            logger.info(
+                "Updating upstream %s branch cache at %s...",
+                original_repo_branch,
+                cache_path,
+            )
+            update_cache_cmd = _upstream_cache_update_cmd(
+                cache_path, original_repo_branch
+            )
+            # A failed refresh (e.g. another run holding the ref lock) leaves
+            # the existing cache usable, so carry on with it.
+            fetch_steps.append(
+                (update_cache_cmd, _UPSTREAM_CACHE_STALE_MESSAGE, False)
+            )
+        _run_git_concurrently(fetch_steps)
+
+        # All upstream objects are already reachable through the alternate,
+        # so this local fetch only copies the branch ref.
+        fetch_upstream_cmd = [
+            "git",
+            "-C",
+            forked_path,
+            "fetch",
+            "--no-tags",
+            "--no-write-fetch-head",
+            cache_path,
+            f"+refs/heads/{original_repo_branch}"
+            f":refs/remotes/upstream/{original_repo_branch}",
+        ]
+        logger.info("Fetching upstream %s branch from cache...", original_repo_branch)
+        _run_git(fetch_upstream_cmd, "Failed to fetch upstream branch from cache")
+
+        diff_range = (
+            f"refs/remotes/upstream/{original_repo_branch}"
+            f"...refs/remotes/origin/{fork_repo_branch}"
+        )
+        yield forked_path, diff_range
+
+
 def analyze_fork_differences(
     original_repo_url: str,
     fork_repo_url: str,
     fork_repo_branch: str,
     original_repo_branch: str = "develop",
     file_filters: Optional[List[str]] = None,
-) -> Tuple[str, Tuple[int, int]]:
+    diff_output_fp: Optional[BinaryIO] = None,
+    update_upstream_cache: bool = True,
+) -> Tuple[Optional[bytes], Tuple[int, int]]:
     """
     Analyzes differences between an original repository and a specific fork.
 
@@ -50,113 +500,516 @@ def analyze_fork_differences(
         fork_repo_branch: The branch of the fork to compare.
         original_repo_branch: The branch of the original repository to compare against.
         file_filters: Optional list of file patterns to filter the diff (e.g., ["*.py", "*.js"]).
+        diff_output_fp: Optional binary file for git to write the diff into directly
+            instead of returning it. Open it for reading too (e.g. "w+b") so the
+            line counts can be taken from the written file.
+        update_upstream_cache: Whether to fetch the latest upstream changes into the
+            cache; an existing cache is used as-is when False.
 
     Returns:
         A tuple containing:
-            - The raw diff output as a string
+            - The raw diff output as bytes, or None if it was written to diff_output_fp
             - A tuple of (additions, deletions) counts
     """
     if file_filters is None:
         file_filters = []
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        logger.info(f"Created temporary directory: {tmpdir}")
+    with _prepared_fork_repository(
+        original_repo_url,
+        fork_repo_url,
+        fork_repo_branch,
+        original_repo_branch,
+        update_upstream_cache,
+    ) as (forked_path, diff_range):
+        pathspec_args = ["--", *file_filters] if file_filters else []
+        diff_cmd = ["git", "diff", diff_range, *pathspec_args]
 
-        forked_path = os.path.join(tmpdir, "forked")
+        if diff_output_fp is not None:
+            # git writes the patch straight into the file, so Python never
+            # holds the diff bytes; the line counts come from a mapped scan
+            # of the written file afterwards.
+            _log_command("Running diff command", diff_cmd)
+            diff_output_fp.flush()
+            diff_start = diff_output_fp.tell()
+            result = subprocess.run(
+                diff_cmd,
+                cwd=forked_path,
+                check=False,
+                stdout=diff_output_fp,
+                stderr=subprocess.PIPE,
+            )
 
-        clone_cmd = [
-            "git",
-            "clone",
-            "--branch",
-            fork_repo_branch,
-            fork_repo_url,
-            forked_path,
+            # 0 = no diff, 1 = diff found, >1 = error
+            if result.returncode > 1:
+                logger.error(
+                    "Git diff command failed with return code %d: %s",
+                    result.returncode,
+                    result.stderr.decode(errors="replace"),
+                )
+                sys.exit(1)
+
+            counts = _parse_diff_file(diff_output_fp, diff_start)
+            if counts is None:
+                # The file cannot be read back, so let git count the lines.
+                shortstat_cmd = [
+                    "git", "diff", "--shortstat", diff_range, *pathspec_args
+                ]
+                _log_command("Running shortstat command", shortstat_cmd)
+                shortstat = subprocess.run(
+                    shortstat_cmd,
+                    cwd=forked_path,
+                    check=False,
+                    capture_output=True,
+                    text=True,
+                )
+                if shortstat.returncode > 1:
+                    logger.error(
+                        "Git shortstat command failed with return code %d: %s",
+                        shortstat.returncode,
+                        shortstat.stderr,
+                    )
+                    sys.exit(1)
+                counts = _parse_shortstat(shortstat.stdout)
+
+            additions, deletions = counts
+            logger.info(
+                "Diff analysis complete: %d additions, %d deletions",
+                additions,
+                deletions,
+            )
+            return None, (additions, deletions)
+
+        # Ask for the shortstat summary in the same invocation, so git parses
+        # the pathspecs and walks the trees only once for both the patch and
+        # the line counts.
+        stat_diff_cmd = [
+            "git", "diff", "--patch", "--shortstat", diff_range, *pathspec_args
         ]
-        logger.info(
-            f"Cloning fork repository {fork_repo_url} branch {fork_repo_branch}..."
-        )
-        logger.info(f"Executing command: {' '.join(clone_cmd)}")
-        try:
-            subprocess.run(
-                clone_cmd,
-                check=True,
-                capture_output=True,
-                text=True,
+        _log_command("Running diff command", stat_diff_cmd)
+        # git diff has specific exit codes
+        # 0 = no diff, 1 = diff found, >1 = error
+        returncode, stdout, stderr = _capture_output(stat_diff_cmd, forked_path)
+
+        # Handle potential errors from git diff if returncode is not 0 or 1
+        if returncode > 1:
+            logger.error(
+                "Git diff command failed with return code %d: %s",
+                returncode,
+                stderr.decode(errors="replace"),
             )
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Failed to clone fork repository: {e.stderr}")
             sys.exit(1)
 
-        add_remote_cmd = ["git", "remote", "add", "upstream", original_repo_url]
+        if not stdout and returncode == 0:
+            logger.info("No differences found between branches.")
+        elif not stdout and returncode == 1:
+            logger.warning(
+                "Git diff reported differences (exit code 1) but produced no stdout. "
+                "Stderr: %s",
+                stderr.decode(errors="replace"),
+            )
+
+        # The summary line (" N files changed, ...") and a blank line precede
+        # the patch itself.
+        if stdout.startswith(b" "):
+            shortstat_line, _, diff_output = stdout.partition(b"\n\n")
+            additions, deletions = _parse_shortstat(shortstat_line.decode())
+        else:
+            diff_output = stdout
+            additions, deletions = _parse_diff_output(diff_output)
         logger.info(
-            f"Adding original repository {original_repo_url} as upstream remote..."
+            "Diff analysis complete: %d additions, %d deletions", additions, deletions
         )
-        logger.info(f"Executing command: {' '.join(add_remote_cmd)}")
-        try:
-            subprocess.run(
-                add_remote_cmd,
-                cwd=forked_path,
-                check=True,
-                capture_output=True,
-            )
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Failed to add upstream remote: {e.stderr}")
-            sys.exit(1)
 
-        fetch_upstream_cmd = ["git", "fetch", "upstream", original_repo_branch]
-        logger.info(f"Fetching upstream {original_repo_branch} branch...")
-        logger.info(f"Executing command: {' '.join(fetch_upstream_cmd)}")
-        try:
-            subprocess.run(
-                fetch_upstream_cmd,
-                cwd=forked_path,
-                check=True,
-                capture_output=True,
-            )
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Failed to fetch upstream branch: {e.stderr}")
-            sys.exit(1)
+        return diff_output, (additions, deletions)
 
-        diff_cmd = ["git", "diff", f"upstream/{original_repo_branch}...HEAD"]
-        if file_filters:
-            diff_cmd.append("--")
-            diff_cmd.extend(file_filters)
 
-        logger.info(f"Running diff command: {' '.join(diff_cmd)}")
-        # Revert to check=False for git diff as it has specific exit codes
-        # 0 = no diff, 1 = diff found, >1 = error
+def analyze_fork_diff_stats(
+    original_repo_url: str,
+    fork_repo_url: str,
+    fork_repo_branch: str,
+    original_repo_branch: str = "develop",
+    file_filters: Optional[List[str]] = None,
+    update_upstream_cache: bool = True,
+) -> Tuple[int, int]:
+    """
+    Counts the lines a fork adds and deletes without generating the unified diff.
+
+    Takes the same arguments as analyze_fork_differences, but asks git for
+    per-file numstat records, so the work is proportional to the number of
+    changed files rather than the size of the diff.
+
+    Returns:
+        A tuple of (additions, deletions) counts.
+    """
+    if file_filters is None:
+        file_filters = []
+
+    with _prepared_fork_repository(
+        original_repo_url,
+        fork_repo_url,
+        fork_repo_branch,
+        original_repo_branch,
+        update_upstream_cache,
+    ) as (forked_path, diff_range):
+        pathspec_args = ["--", *file_filters] if file_filters else []
+        numstat_cmd = ["git", "diff", "--numstat", "-z", diff_range, *pathspec_args]
+        _log_command("Running numstat command", numstat_cmd)
         result = subprocess.run(
-            diff_cmd,
+            numstat_cmd,
             cwd=forked_path,
             check=False,
             capture_output=True,
-            text=True,
         )
-
-        # Handle potential errors from git diff if returncode is not 0 or 1
         if result.returncode > 1:
             logger.error(
-                f"Git diff command failed with return code {result.returncode}: {result.stderr}"
+                "Git numstat command failed with return code %d: %s",
+                result.returncode,
+                result.stderr.decode(errors="replace"),
             )
             sys.exit(1)
 
-        if not result.stdout and result.returncode == 0:
-            logger.info("No differences found between branches.")
-        elif not result.stdout and result.returncode == 1:
-            logger.warning(
-                "Git diff reported differences (exit code 1) but produced no stdout.Stderr: {result.stderr}"
-            )
+        additions, deletions = _parse_numstat(result.stdout)
+        logger.info(
+            "Diff analysis complete: %d additions, %d deletions", additions, deletions
+        )
+        return additions, deletions
+
 
-        diff_output = result.stdout
-        additions, deletions = _parse_diff_output(diff_output)
+def analyze_many_forks(
+    original_repo_url: str,
+    fork_specs: List[Tuple[str, str]],
+    original_repo_branch: str = "develop",
+    file_filters: Optional[List[str]] = None,
+    workers: Optional[int] = None,
+) -> List[Tuple[str, Optional[bytes], Optional[Tuple[int, int]]]]:
+    """
+    Analyzes several forks of the same original repository in parallel.
+
+    The upstream cache is updated once up front, then each fork is fetched and
+    diffed in its own worker process against that shared cache.
+
+    Args:
+        original_repo_url: The clone URL of the original repository.
+        fork_specs: List of (fork clone URL, fork branch) pairs to compare.
+        original_repo_branch: The branch of the original repository to compare against.
+        file_filters: Optional list of file patterns to filter the diff (e.g., ["*.py", "*.js"]).
+        workers: Maximum number of worker processes (defaults to the CPU count).
+
+    Returns:
+        A list with one (fork URL, raw diff bytes, (additions, deletions)) tuple per
+        fork, in the same order as fork_specs. A fork that fails (e.g. a missing
+        branch) is logged and reported as (fork URL, None, None) without affecting
+        the other forks.
+    """
+    cache_path = _upstream_cache_path(original_repo_url)
+    if os.path.isdir(cache_path):
         logger.info(
-            f"Diff analysis complete: {additions} additions, {deletions} deletions"
+            "Updating upstream %s branch cache at %s...", original_repo_branch, cache_path
         )
+        update_cache_cmd = _upstream_cache_update_cmd(cache_path, original_repo_branch)
+        _log_command("Executing command", update_cache_cmd)
+        result = subprocess.run(update_cache_cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            logger.warning("%s: %s", _UPSTREAM_CACHE_STALE_MESSAGE, result.stderr)
+    else:
+        logger.info(
+            "Creating upstream %s branch cache at %s...", original_repo_branch, cache_path
+        )
+        _create_upstream_cache(cache_path, original_repo_url, original_repo_branch)
 
-        return diff_output, (additions, deletions)
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        futures = [
+            executor.submit(
+                analyze_fork_differences,
+                original_repo_url=original_repo_url,
+                fork_repo_url=fork_repo_url,
+                fork_repo_branch=fork_repo_branch,
+                original_repo_branch=original_repo_branch,
+                file_filters=file_filters,
+                update_upstream_cache=False,
+            )
+            for fork_repo_url, fork_repo_branch in fork_specs
+        ]
+        results = []
+        for (fork_repo_url, _), future in zip(fork_specs, futures):
+            try:
+                diff_output, counts = future.result()
+            except (Exception, SystemExit) as e:
+                # analyze_fork_differences exits on git failures, and the
+                # SystemExit is re-raised here from the worker process.
+                logger.error("Failed to analyze fork %s: %r", fork_repo_url, e)
+                diff_output, counts = None, None
+            results.append((fork_repo_url, diff_output, counts))
+    return results
+
+
+def _parse_github_url(url: str) -> Optional[Tuple[str, str]]:
+    """Returns (owner, repo) for a GitHub repository URL, or None for other hosts."""
+    match = _GITHUB_REPO_RE.match(url)
+    if not match:
+        return None
+    return match.group("owner"), match.group("repo")
+
+
+def _glob_to_regex(pattern: str) -> str:
+    """Translates a pathspec pattern into a regex matching the way git does by default."""
+    if not any(char in pattern for char in _GLOB_CHARS):
+        # Literal pathspecs also match everything below a directory.
+        return re.escape(pattern.rstrip("/")) + "(?:/.*)?"
+
+    # Without the :(glob) magic, git's wildcards also match across "/".
+    parts = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        i += 1
+        if char == "*":
+            parts.append(".*")
+        elif char == "?":
+            parts.append(".")
+        elif char == "[":
+            end = pattern.find("]", i + 1 if pattern[i:i + 1] in ("!", "]") else i)
+            if end == -1:
+                parts.append(re.escape(char))
+                continue
+            members = pattern[i:end].replace("\\", "\\\\")
+            if members.startswith("!"):
+                members = "^" + members[1:]
+            parts.append(f"[{members}]")
+            i = end + 1
+        else:
+            parts.append(re.escape(char))
+    return "".join(parts)
+
+
+def _compile_alternation(patterns: List[str]):
+    """Combines regex patterns into one compiled alternation, or None if there are none."""
+    if not patterns:
+        return None
+    return _filter_re.compile("(?s)(?:" + "|".join(patterns) + ")")
+
+
+def _compile_path_filter(file_filters: List[str]) -> Optional[Callable[[str], bool]]:
+    """Compiles git pathspecs into one predicate over file paths.
+
+    All include patterns are combined into a single alternation, and likewise
+    all exclude patterns, so each path is checked with at most two matches.
+    Returns None if a pathspec uses magic other than exclude, which cannot be
+    reproduced outside of git.
+    """
+    includes = []
+    excludes = []
+    for pathspec in file_filters:
+        for prefix in _EXCLUDE_MAGIC_PREFIXES:
+            if pathspec.startswith(prefix):
+                excludes.append(_glob_to_regex(pathspec[len(prefix):]))
+                break
+        else:
+            if pathspec.startswith(":"):
+                return None
+            includes.append(_glob_to_regex(pathspec))
+
+    include_re = _compile_alternation(includes)
+    exclude_re = _compile_alternation(excludes)
+
+    def path_filter(path: str) -> bool:
+        if include_re is not None and not include_re.fullmatch(path):
+            return False
+        return exclude_re is None or not exclude_re.fullmatch(path)
+
+    return path_filter
+
+
+def _diff_section_path(section: bytes) -> str:
+    """Extracts the post-image path from a section following `diff --git `."""
+    header_end = section.find(b"\n")
+    header = section[:header_end] if header_end != -1 else section
+    if header.endswith(b'"'):
+        path = header[header.rfind(b' "b/') + 4:-1]
+    else:
+        path_length = (len(header) - len(b"a/ b/")) // 2
+        if path_length and header[2:2 + path_length] == header[-path_length:]:
+            path = header[-path_length:]
+        else:
+            path = header.rsplit(b" b/", 1)[-1]
+    return path.decode("utf-8", errors="surrogateescape")
+
+
+def _filter_diff(diff_bytes: bytes, path_filter: Callable[[str], bool]) -> bytes:
+    """Keeps only the file sections of a diff whose path passes the filter."""
+    separator = b"\ndiff --git "
+    sections = diff_bytes.split(separator)
+    if sections[0].startswith(separator[1:]):
+        sections[0] = sections[0][len(separator) - 1:]
+    else:
+        # Anything before the first file header is not part of a file hunk.
+        sections = sections[1:]
+
+    kept = [
+        section for section in sections if path_filter(_diff_section_path(section))
+    ]
+    if not kept:
+        return b""
+    filtered = separator[1:] + separator.join(kept)
+    return filtered if filtered.endswith(b"\n") else filtered + b"\n"
+
+
+def _request_github_compare(
+    original_repo_url: str,
+    fork_repo_url: str,
+    fork_repo_branch: str,
+    original_repo_branch: str,
+    accept: str,
+) -> Optional[bytes]:
+    """Requests the fork-vs-original comparison from GitHub, or None if unavailable."""
+    original_repo = _parse_github_url(original_repo_url)
+    fork_repo = _parse_github_url(fork_repo_url)
+    if original_repo is None or fork_repo is None:
+        return None
+
+    orig_owner, orig_repo = original_repo
+    fork_owner, fork_name = fork_repo
+    # Name the fork repository explicitly; "owner:branch" alone resolves to
+    # the owner's fork under the upstream's name, which may not be this one.
+    basehead = urllib.parse.quote(
+        f"{original_repo_branch}...{fork_owner}:{fork_name}:{fork_repo_branch}",
+        safe="/:",
+    )
+    compare_url = (
+        f"https://api.github.com/repos/{orig_owner}/{orig_repo}/compare/{basehead}"
+    )
+    headers = {"Accept": accept, "User-Agent": "github_scraper"}
+    token = os.environ.get("GITHUB_TOKEN")
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+
+    logger.info("Requesting GitHub compare API: %s (%s)", compare_url, accept)
+    try:
+        request = urllib.request.Request(compare_url, headers=headers)
+        with urllib.request.urlopen(request, timeout=60) as response:
+            return response.read()
+    except (urllib.error.URLError, OSError, http.client.HTTPException) as e:
+        # HTTPException covers responses cut short mid-body (IncompleteRead).
+        logger.warning("GitHub compare API request failed: %s", e)
+        return None
+
+
+def fetch_github_compare_diff(
+    original_repo_url: str,
+    fork_repo_url: str,
+    fork_repo_branch: str,
+    original_repo_branch: str = "develop",
+    file_filters: Optional[List[str]] = None,
+) -> Optional[Tuple[bytes, Tuple[int, int]]]:
+    """
+    Fetches the fork diff from GitHub's compare API without any local git operations.
+
+    Args:
+        original_repo_url: The URL of the original GitHub repository.
+        fork_repo_url: The URL of the forked GitHub repository.
+        fork_repo_branch: The branch of the fork to compare.
+        original_repo_branch: The branch of the original repository to compare against.
+        file_filters: Optional list of git pathspecs to filter the diff (e.g., ["*.py", "*.js"]).
+
+    Returns:
+        The same (diff bytes, (additions, deletions)) tuple as analyze_fork_differences,
+        or None if the API cannot be used (non-GitHub URLs, unsupported pathspec magic,
+        private repositories, rate limits, diffs too large for the API, ...).
+    """
+    path_filter = _compile_path_filter(file_filters or [])
+    if path_filter is None:
+        logger.info("File filters use pathspec magic the GitHub API path cannot apply.")
+        return None
+
+    diff_bytes = _request_github_compare(
+        original_repo_url,
+        fork_repo_url,
+        fork_repo_branch,
+        original_repo_branch,
+        "application/vnd.github.v3.diff",
+    )
+    if diff_bytes is None:
+        return None
+
+    # The API has no pathspec support, so drop unwanted files locally.
+    if file_filters:
+        diff_bytes = _filter_diff(diff_bytes, path_filter)
+    additions, deletions = _parse_diff_output(diff_bytes)
+    logger.info(
+        "Diff analysis complete: %d additions, %d deletions", additions, deletions
+    )
+    return diff_bytes, (additions, deletions)
+
+
+def fetch_github_compare_stats(
+    original_repo_url: str,
+    fork_repo_url: str,
+    fork_repo_branch: str,
+    original_repo_branch: str = "develop",
+    file_filters: Optional[List[str]] = None,
+) -> Optional[Tuple[int, int]]:
+    """
+    Counts a fork's additions and deletions from the compare API's per-file summary.
+
+    Takes the same arguments as fetch_github_compare_diff.
+
+    Returns:
+        A tuple of (additions, deletions) counts, or None if the API cannot be used
+        or its file list was truncated.
+    """
+    path_filter = _compile_path_filter(file_filters or [])
+    if path_filter is None:
+        logger.info("File filters use pathspec magic the GitHub API path cannot apply.")
+        return None
+
+    response_bytes = _request_github_compare(
+        original_repo_url,
+        fork_repo_url,
+        fork_repo_branch,
+        original_repo_branch,
+        "application/vnd.github+json",
+    )
+    if response_bytes is None:
+        return None
+
+    try:
+        files = json.loads(response_bytes).get("files", [])
+        if len(files) >= _GITHUB_COMPARE_MAX_FILES:
+            logger.info("GitHub compare API file list is truncated.")
+            return None
+
+        additions = 0
+        deletions = 0
+        for changed_file in files:
+            if path_filter(changed_file["filename"]):
+                additions += changed_file["additions"]
+                deletions += changed_file["deletions"]
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        # ValueError includes json.JSONDecodeError for a non-JSON body.
+        logger.warning("Unexpected GitHub compare API response: %r", e)
+        return None
+    logger.info(
+        "Diff analysis complete: %d additions, %d deletions", additions, deletions
+    )
+    return additions, deletions
+
+
+def _setup_logging() -> None:
+    """Wires the module logger to the console for command-line use."""
+    log_formatter = logging.Formatter(
+        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    log_handler = logging.StreamHandler(sys.stdout)  # Log to console
+    log_handler.setFormatter(log_formatter)
+    logger.setLevel(logging.INFO)
+    logger.addHandler(log_handler)
 
 
 def main():
+    import argparse
+
+    _setup_logging()
+
     parser = argparse.ArgumentParser(
         description="Collect code differences between a fork and its original repository."
     )
@@ -175,8 +1028,15 @@ def main():
     )
     parser.add_argument(
         "--output_file",
-        help="Path to the plain text file to save the diff output",
-        default="diff.txt",
+        help=(
+            "Path to the plain text file to save the diff output; "
+            "if omitted, only the addition and deletion counts are computed"
+        ),
+    )
+    parser.add_argument(
+        "--no-github-api",
+        action="store_true",
+        help="Always compute the diff with local git instead of GitHub's compare API",
     )
     parser.add_argument(
         "-v",
@@ -189,21 +1049,7 @@ def main():
         "--file-filters",
         nargs="+",
         help="File filters to apply to the diff (e.g., *.py, *.js)",
-        default=[
-            "*.py", "*.js", "*.jsx", "*.ts", "*.tsx",
-            ":(exclude)**/dist/**",
-            ":(exclude)**/build/**",
-            ":(exclude)**/node_modules/**",
-            ":(exclude)**/.cache/**",
-            ":(exclude)**/coverage/**",
-            ":(exclude)**/*.min.js",
-            ":(exclude)**/*.bundle.js",
-            ":(exclude)**/*.chunk.js",
-            ":(exclude)**/*.generated.*",
-            ":(exclude)**/*.d.ts",
-            ":(exclude)**/package-lock.json",
-            ":(exclude)**/yarn.lock"
-        ],
+        default=_DEFAULT_FILE_FILTERS,
     )
 
     args = parser.parse_args()
@@ -215,29 +1061,58 @@ def main():
         logger.debug("Verbose logging enabled.")
 
     logger.info(
-        f"Starting diff collection for fork: {args.fork_url} (branch: {args.fork_branch}) "
-        f"against original: {args.original_url} (branch: {args.original_branch})"
+        "Starting diff collection for fork: %s (branch: %s) "
+        "against original: %s (branch: %s)",
+        args.fork_url,
+        args.fork_branch,
+        args.original_url,
+        args.original_branch,
     )
 
-    diff_text, (additions, deletions) = analyze_fork_differences(
+    compare_args = dict(
         original_repo_url=args.original_url,
         fork_repo_url=args.fork_url,
         fork_repo_branch=args.fork_branch,
         original_repo_branch=args.original_branch,
-        file_filters=args.file_filters,
+        file_filters=list(args.file_filters),
     )
 
-    try:
-        with open(args.output_file, "w", encoding="utf-8") as f:
-            f.write(diff_text)
-        logger.info(f"Successfully saved diff output to {args.output_file}")
-        print(f"Diff output saved to: {args.output_file}")
+    if args.output_file is None:
+        stats = None
+        if not args.no_github_api:
+            stats = fetch_github_compare_stats(**compare_args)
+        if stats is None:
+            logger.info("Falling back to local git to count the changes.")
+            stats = analyze_fork_diff_stats(**compare_args)
+        additions, deletions = stats
         print(f"Summary: {additions} additions, {deletions} deletions.")
+        return
+
+    try:
+        output_fp = open(args.output_file, "w+b")
     except IOError as e:
-        logger.error(f"Failed to write diff to output file {args.output_file}: {e}")
+        logger.error("Failed to write diff to output file %s: %s", args.output_file, e)
         print(f"Error: Could not write to file {args.output_file}: {e}")
         sys.exit(1)
 
+    with output_fp:
+        github_result = None
+        if not args.no_github_api:
+            github_result = fetch_github_compare_diff(**compare_args)
+
+        if github_result is not None:
+            diff_bytes, (additions, deletions) = github_result
+            output_fp.write(diff_bytes)
+        else:
+            logger.info("Falling back to local git to compute the diff.")
+            _, (additions, deletions) = analyze_fork_differences(
+                **compare_args, diff_output_fp=output_fp
+            )
+    logger.info("Successfully saved diff output to %s", args.output_file)
+
+    print(f"Diff output saved to: {args.output_file}")
+    print(f"Summary: {additions} additions, {deletions} deletions.")
+
 
 if __name__ == "__main__":
     main()